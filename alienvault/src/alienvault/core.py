@@ -3,10 +3,17 @@
 
 import os
 import time
+from http.cookiejar import DefaultCookiePolicy
 from typing import Any, Dict, List, Mapping, Optional
 
+from pkg_resources import get_distribution, parse_version
+
+import requests
+from requests.adapters import HTTPAdapter
+
 import yaml
 
+from pycti.api import opencti_api_client
 from pycti.connector.opencti_connector_helper import (
     OpenCTIConnectorHelper,
     get_config_variable,
@@ -19,6 +26,26 @@ from alienvault.client import AlienVaultClient
 from alienvault.importer import PulseImporter
 
 
+class _PooledRequests:
+    """Stand-in for the module level requests post and get calls."""
+
+    def __init__(self, pool_size: int) -> None:
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Module level requests calls do not persist cookies between calls.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.post(url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.session.get(url, **kwargs)
+
+
 class AlienVault:
     """AlienVault connector."""
 
@@ -51,6 +78,15 @@ class AlienVault:
 
     _CONNECTOR_RUN_INTERVAL_SEC = 60
 
+    _PULSE_IMPORTER_MAX_WORKERS = 8
+
+    # Two connections for each pulse importer worker.
+    _OPENCTI_API_POOL_SIZE = _PULSE_IMPORTER_MAX_WORKERS * 2
+
+    # OpenCTI API client versions (min inclusive, max exclusive) issuing only
+    # module level requests.post and requests.get calls, without a session.
+    _PYCTI_MODULE_LEVEL_REQUESTS_VERSION_RANGE = ("3.3.0", "4.4.0")
+
     _STATE_LAST_RUN = "last_run"
 
     def __init__(self) -> None:
@@ -58,6 +94,7 @@ class AlienVault:
         config = self._read_configuration()
 
         self.helper = OpenCTIConnectorHelper(config)
+        self._share_opencti_api_session()
 
         # AlienVault connector configuration
         base_url = self._get_configuration(config, self._CONFIG_BASE_URL)
@@ -104,8 +141,21 @@ class AlienVault:
             report_status,
             report_type,
             guess_malware,
+            self._PULSE_IMPORTER_MAX_WORKERS,
         )
 
+    @classmethod
+    def _share_opencti_api_session(cls) -> None:
+        # These OpenCTI API client versions open a new connection (and TLS
+        # handshake) per query. Route their calls through a pooled session.
+        min_version, max_version = cls._PYCTI_MODULE_LEVEL_REQUESTS_VERSION_RANGE
+
+        pycti_version = parse_version(get_distribution("pycti").version)
+        if not parse_version(min_version) <= pycti_version < parse_version(max_version):
+            return
+
+        opencti_api_client.requests = _PooledRequests(cls._OPENCTI_API_POOL_SIZE)
+
     @staticmethod
     def _create_author() -> Identity:
         return Identity(
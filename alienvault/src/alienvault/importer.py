@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
 """OpenCTI AlienVault importer module."""
 
-from typing import Any, Dict, List, Mapping, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from pycti.connector.opencti_connector_helper import OpenCTIConnectorHelper
 
@@ -20,6 +24,18 @@ class PulseImporter:
 
     _GUESS_NOT_A_MALWARE = "GUESS_NOT_A_MALWARE"
 
+    _MALWARE_GUESS_CACHE_MAX_SIZE = 10000
+
+    # Re-check negative guesses, the malware may have been created since.
+    _MALWARE_GUESS_NOT_A_MALWARE_TTL_SEC = 3 * 60 * 60
+
+    _MALWARE_GUESS_ATTRIBUTES = """
+        id
+        stix_id_key
+        name
+        alias
+    """
+
     def __init__(
         self,
         helper: OpenCTIConnectorHelper,
@@ -31,6 +47,7 @@ class PulseImporter:
         report_status: int,
         report_type: str,
         guess_malware: bool,
+        max_workers: int,
     ) -> None:
         """Initialize AlienVault indicator importer."""
         self.helper = helper
@@ -42,8 +59,10 @@ class PulseImporter:
         self.report_status = report_status
         self.report_type = report_type
         self.guess_malware = guess_malware
+        self.max_workers = max_workers
 
-        self.malware_guess_cache: Dict[str, str] = {}
+        self.malware_guess_cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.malware_guess_cache_lock = threading.Lock()
 
     def run(self, state: Mapping[str, Any]) -> Mapping[str, Any]:
         """Run importer."""
@@ -53,27 +72,27 @@ class PulseImporter:
             self.guess_malware,
         )
 
-        self._clear_malware_guess_cache()
-
         fetch_timestamp = state.get(
             self._LATEST_PULSE_TIMESTAMP, self.default_latest_timestamp
         )
         fetch_datetime = iso_datetime_str_to_datetime(fetch_timestamp)
 
-        latest_fetched_indicator_datetime = fetch_datetime
-
         pulses = self.client.get_pulses_subscribed(fetch_datetime)
         pulse_count = len(pulses)
 
         self._info("{0} pulse(s) since {1}...", pulse_count, fetch_datetime)
 
-        for pulse in pulses:
-            self._process_pulse(pulse)
+        if pulse_count == 0:
+            self._info("Pulse importer completed (imported: 0), no new pulses.")
+            return {self._LATEST_PULSE_TIMESTAMP: fetch_timestamp}
 
-            if pulse.modified > latest_fetched_indicator_datetime:
-                latest_fetched_indicator_datetime = pulse.modified
+        source_name = self._source_name()
+        confidence_level = self._confidence_level()
+        object_marking_refs = [self.tlp_marking]
 
-        state_timestamp = latest_fetched_indicator_datetime
+        self._process_pulses(pulses, source_name, confidence_level, object_marking_refs)
+
+        state_timestamp = max(fetch_datetime, max(pulse.modified for pulse in pulses))
 
         self._info(
             "Pulse importer completed (imported: {0}), latest fetch {1}.",
@@ -83,8 +102,28 @@ class PulseImporter:
 
         return {self._LATEST_PULSE_TIMESTAMP: state_timestamp.isoformat()}
 
-    def _clear_malware_guess_cache(self):
-        self.malware_guess_cache.clear()
+    def _get_malware_guess_cache(self, name: str) -> Optional[str]:
+        entry = self.malware_guess_cache.get(name)
+        if entry is None:
+            return None
+
+        guess, cached_at = entry
+        age = time.monotonic() - cached_at
+        if (
+            guess == self._GUESS_NOT_A_MALWARE
+            and age > self._MALWARE_GUESS_NOT_A_MALWARE_TTL_SEC
+        ):
+            del self.malware_guess_cache[name]
+            return None
+
+        self.malware_guess_cache.move_to_end(name)
+        return guess
+
+    def _put_malware_guess_cache(self, name: str, guess: str) -> None:
+        self.malware_guess_cache[name] = (guess, time.monotonic())
+        self.malware_guess_cache.move_to_end(name)
+        if len(self.malware_guess_cache) > self._MALWARE_GUESS_CACHE_MAX_SIZE:
+            self.malware_guess_cache.popitem(last=False)
 
     def _info(self, msg: str, *args: Any) -> None:
         fmt_msg = msg.format(*args)
@@ -94,21 +133,78 @@ class PulseImporter:
         fmt_msg = msg.format(*args)
         self.helper.log_error(fmt_msg)
 
-    def _process_pulse(self, pulse: Pulse) -> None:
+    def _process_pulses(
+        self,
+        pulses: List[Pulse],
+        source_name: str,
+        confidence_level: int,
+        object_marking_refs: List[MarkingDefinition],
+    ) -> None:
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        futures = {
+            executor.submit(
+                self._process_pulse,
+                pulse,
+                source_name,
+                confidence_level,
+                object_marking_refs,
+            ): pulse
+            for pulse in pulses
+        }
+
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # Stop on the first failure (or interrupt), queued pulses are dropped.
+            for future in futures:
+                future.cancel()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            self._log_failed_pulses(futures)
+
+    def _log_failed_pulses(self, futures: Mapping[Future, Pulse]) -> None:
+        for future, pulse in futures.items():
+            if future.cancelled():
+                continue
+
+            exception = future.exception()
+            if exception is not None:
+                self._error(
+                    "Processing pulse {0} ({1}) failed: {2}",
+                    pulse.name,
+                    pulse.id,
+                    exception,
+                )
+
+    def _process_pulse(
+        self,
+        pulse: Pulse,
+        source_name: str,
+        confidence_level: int,
+        object_marking_refs: List[MarkingDefinition],
+    ) -> None:
         self._info("Processing pulse {0} ({1})...", pulse.name, pulse.id)
 
-        pulse_bundle = self._create_pulse_bundle(pulse)
+        pulse_bundle = self._create_pulse_bundle(
+            pulse, source_name, confidence_level, object_marking_refs
+        )
 
         self._send_bundle(pulse_bundle)
 
-    def _create_pulse_bundle(self, pulse: Pulse) -> Bundle:
+    def _create_pulse_bundle(
+        self,
+        pulse: Pulse,
+        source_name: str,
+        confidence_level: int,
+        object_marking_refs: List[MarkingDefinition],
+    ) -> Bundle:
         author = self.author
-        source_name = self._source_name()
-        object_marking_refs = [self.tlp_marking]
-        confidence_level = self._confidence_level()
         report_status = self.report_status
         report_type = self.report_type
-        guessed_malwares = self._guess_malwares_from_tags(pulse.tags)
+        guessed_malwares = self._guess_malwares_from_tags(pulse)
 
         bundle_builder = PulseBundleBuilder(
             pulse,
@@ -122,49 +218,96 @@ class PulseImporter:
         )
         return bundle_builder.build()
 
-    def _guess_malwares_from_tags(self, tags: List[str]) -> Mapping[str, str]:
+    def _guess_malwares_from_tags(self, pulse: Pulse) -> Mapping[str, str]:
         if not self.guess_malware:
             return {}
 
-        malwares = {}
-        for tag in tags:
-            if not tag:
-                continue
+        tags = pulse.tags
 
-            guess = self.malware_guess_cache.get(tag)
-            if guess is None:
-                guess = self._GUESS_NOT_A_MALWARE
+        with self.malware_guess_cache_lock:
+            guesses = {tag: self._get_malware_guess_cache(tag) for tag in tags if tag}
 
-                stix_id = self._fetch_malware_stix_id_by_name(tag)
-                if stix_id is not None:
-                    guess = stix_id
+        missing = [tag for tag, guess in guesses.items() if guess is None]
+        if missing:
+            stix_ids = self._fetch_malware_stix_ids_by_names(missing)
+            for name in missing:
+                guesses[name] = stix_ids.get(name, self._GUESS_NOT_A_MALWARE)
 
-                self.malware_guess_cache[tag] = guess
+            with self.malware_guess_cache_lock:
+                for name in missing:
+                    self._put_malware_guess_cache(name, guesses[name])
 
+        malwares = {}
+        not_malwares = []
+        for tag, guess in guesses.items():
             if guess == self._GUESS_NOT_A_MALWARE:
-                self._info("Tag '{0}' does not reference malware", tag)
+                not_malwares.append(tag)
             else:
-                self._info("Tag '{0}' references malware '{1}'", tag, guess)
                 malwares[tag] = guess
+
+        if not_malwares:
+            self._info("Pulse {0} tags without malware: {1}", pulse.id, not_malwares)
+        if malwares:
+            self._info("Pulse {0} tags referencing malware: {1}", pulse.id, malwares)
+
         return malwares
 
-    def _fetch_malware_stix_id_by_name(self, name: str) -> Optional[str]:
-        filters = [
-            self._create_filter("name", name),
-            self._create_filter("alias", name),
-        ]
-        for _filter in filters:
-            malwares = self.helper.api.malware.list(filters=_filter)
-            if malwares:
-                if len(malwares) > 1:
-                    self._info("More then one malware for '{0}'", name)
-                malware = malwares[0]
-                return malware["stix_id_key"]
-        return None
+    def _fetch_malware_stix_ids_by_names(self, names: List[str]) -> Dict[str, str]:
+        # Filter values are OR'ed together by the API, but separate filters are
+        # AND'ed, hence one query for names and one for aliases.
+        stix_ids: Dict[str, str] = {}
+
+        malwares = self.helper.api.malware.list(
+            filters=self._create_filter("name", names),
+            customAttributes=self._MALWARE_GUESS_ATTRIBUTES,
+        )
+        tags_by_name = self._group_by_casefold(names)
+        for malware in malwares:
+            self._add_malware_stix_id(stix_ids, tags_by_name, malware["name"], malware)
+
+        unresolved = [name for name in names if name not in stix_ids]
+        if not unresolved:
+            return stix_ids
+
+        malwares = self.helper.api.malware.list(
+            filters=self._create_filter("alias", unresolved),
+            customAttributes=self._MALWARE_GUESS_ATTRIBUTES,
+        )
+        tags_by_alias = self._group_by_casefold(unresolved)
+        for malware in malwares:
+            aliases = malware.get("alias") or []
+            for alias in aliases:
+                self._add_malware_stix_id(stix_ids, tags_by_alias, alias, malware)
+
+        return stix_ids
+
+    @staticmethod
+    def _group_by_casefold(names: List[str]) -> Dict[str, List[str]]:
+        # The API may match names regardless of case, map results back the same way.
+        grouped: Dict[str, List[str]] = {}
+        for name in names:
+            grouped.setdefault(name.casefold(), []).append(name)
+        return grouped
+
+    def _add_malware_stix_id(
+        self,
+        stix_ids: Dict[str, str],
+        tags_by_name: Mapping[str, List[str]],
+        name: str,
+        malware: Mapping[str, Any],
+    ) -> None:
+        tags = tags_by_name.get(name.casefold())
+        if not tags:
+            return
+        if tags[0] in stix_ids:
+            self._info("More then one malware for '{0}'", tags[0])
+            return
+        for tag in tags:
+            stix_ids[tag] = malware["stix_id_key"]
 
     @staticmethod
-    def _create_filter(key: str, value: str) -> List[Mapping[str, Any]]:
-        return [{"key": key, "values": [value]}]
+    def _create_filter(key: str, values: List[str]) -> List[Mapping[str, Any]]:
+        return [{"key": key, "values": values}]
 
     def _source_name(self) -> str:
         return self.helper.connect_name
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 """OpenCTI AlienVault utilities module."""
 
+import itertools
 from datetime import datetime
-from typing import List, Mapping, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Union
 
 from pycti.utils.constants import CustomProperties
 
@@ -197,17 +198,45 @@ def create_relationship(
     confidence_level: int,
 ) -> Relationship:
     """Create a relationship."""
+    custom_properties = _create_relationship_custom_properties(
+        first_seen, last_seen, confidence_level
+    )
+    return _create_relationship_with_custom_properties(
+        relationship_type,
+        author,
+        source,
+        target,
+        object_marking_refs,
+        custom_properties,
+    )
+
+
+def _create_relationship_custom_properties(
+    first_seen: datetime, last_seen: datetime, confidence_level: int
+) -> Dict[str, Any]:
+    return {
+        CustomProperties.FIRST_SEEN: first_seen,
+        CustomProperties.LAST_SEEN: last_seen,
+        CustomProperties.WEIGHT: confidence_level,
+    }
+
+
+def _create_relationship_with_custom_properties(
+    relationship_type: str,
+    author: Identity,
+    source: STIXDomainObject,
+    target: STIXDomainObject,
+    object_marking_refs: List[MarkingDefinition],
+    custom_properties: Mapping[str, Any],
+) -> Relationship:
+    # Relationship copies the custom properties, the mapping can be shared.
     return Relationship(
         created_by_ref=author,
         relationship_type=relationship_type,
         source_ref=source.id,
         target_ref=target.id,
         object_marking_refs=object_marking_refs,
-        custom_properties={
-            CustomProperties.FIRST_SEEN: first_seen,
-            CustomProperties.LAST_SEEN: last_seen,
-            CustomProperties.WEIGHT: confidence_level,
-        },
+        custom_properties=custom_properties,
     )
 
 
@@ -222,21 +251,20 @@ def create_relationships(
     confidence_level: int,
 ) -> List[Relationship]:
     """Create relationships."""
-    relationships = []
-    for source in sources:
-        for target in targets:
-            relationship = create_relationship(
-                relationship_type,
-                author,
-                source,
-                target,
-                object_marking_refs,
-                first_seen,
-                last_seen,
-                confidence_level,
-            )
-            relationships.append(relationship)
-    return relationships
+    custom_properties = _create_relationship_custom_properties(
+        first_seen, last_seen, confidence_level
+    )
+    return [
+        _create_relationship_with_custom_properties(
+            relationship_type,
+            author,
+            source,
+            target,
+            object_marking_refs,
+            custom_properties,
+        )
+        for source, target in itertools.product(sources, targets)
+    ]
 
 
 def create_uses_relationships(
@@ -12,7 +12,11 @@ from pycti.connector.opencti_connector_helper import OpenCTIConnectorHelper
 from stix2 import Bundle, Identity, MarkingDefinition
 
 from crowdstrike.actor_bundle_builder import ActorBundleBuilder
-from crowdstrike.utils import datetime_to_timestamp, paginate, timestamp_to_datetime
+from crowdstrike.utils import (
+    datetime_to_timestamp,
+    paginate_items,
+    timestamp_to_datetime,
+)
 
 
 class ActorImporter:
@@ -46,31 +50,29 @@ class ActorImporter:
         )
 
         latest_fetched_actor_timestamp = None
+        actor_count = 0
 
-        for actors_batch in self._fetch_actors(fetch_timestamp):
-            if not actors_batch:
-                break
-
+        for actor in self._fetch_actors(fetch_timestamp):
             if latest_fetched_actor_timestamp is None:
-                first_in_batch = actors_batch[0]
-
-                created_date = first_in_batch.created_date
+                created_date = actor.created_date
                 if created_date is None:
                     self._error(
                         "Missing created date for actor {0} ({1})",
-                        first_in_batch.name,
-                        first_in_batch.id,
+                        actor.name,
+                        actor.id,
                     )
                     break
 
                 latest_fetched_actor_timestamp = datetime_to_timestamp(created_date)
 
-            self._process_actors(actors_batch)
+            self._process_actor(actor)
+            actor_count += 1
 
         state_timestamp = latest_fetched_actor_timestamp or fetch_timestamp
 
         self._info(
-            "Actor importer completed, latest fetch {0}.",
+            "Actor importer completed (imported: {0}), latest fetch {1}.",
+            actor_count,
             timestamp_to_datetime(state_timestamp),
         )
 
@@ -84,13 +86,14 @@ class ActorImporter:
         fmt_msg = msg.format(*args)
         self.helper.log_error(fmt_msg)
 
-    def _fetch_actors(self, start_timestamp: int) -> Generator[List[Actor], None, None]:
+    def _fetch_actors(self, start_timestamp: int) -> Generator[Actor, None, None]:
         limit = 50
         sort = "created_date|desc"
         fql_filter = f"created_date:>{start_timestamp}"
         fields = ["__full__"]
 
-        paginated_query = paginate(self._query_actor_entities)
+        # Actor processing makes no CrowdStrike API calls, prefetching is safe.
+        paginated_query = paginate_items(self._query_actor_entities, prefetch=True)
 
         return paginated_query(
             limit=limit, sort=sort, fql_filter=fql_filter, fields=fields
@@ -117,15 +120,6 @@ class ActorImporter:
             limit=limit, offset=offset, sort=sort, fql_filter=fql_filter, fields=fields
         )
 
-    def _process_actors(self, actors: List[Actor]) -> None:
-        actor_count = len(actors)
-        self._info("Processing {0} actors...", actor_count)
-
-        for actor in actors:
-            self._process_actor(actor)
-
-        self._info("Processing actors completed (imported: {0})", actor_count)
-
     def _process_actor(self, actor: Actor) -> None:
         self._info("Processing actor {0}...", actor.id)
 
@@ -36,7 +36,7 @@ from crowdstrike.utils import (
     create_intrusion_set,
     create_kill_chain_phase,
     create_malware,
-    create_object_refs,
+    create_object_refs_from_lists,
     create_sector,
     create_stix2_report_from_report,
     create_tags,
@@ -477,7 +477,7 @@ class IndicatorBundleBuilder:
         bundle_objects.extend(indicator_indicates_entities)
 
         # Create object references for the report.
-        object_refs = create_object_refs(
+        object_refs = create_object_refs_from_lists(
             intrusion_sets,
             malwares,
             intrusion_sets_use_malwares,
@@ -23,7 +23,7 @@ from crowdstrike.utils import (
     create_external_reference,
     create_intrusion_set_from_actor,
     create_malware,
-    create_object_refs,
+    create_object_refs_from_lists,
     create_organization,
     create_sectors_from_entities,
     create_stix2_report_from_report,
@@ -295,7 +295,7 @@ class ReportBundleBuilder:
         bundle_objects.extend(malwares_target_countries)
 
         # Create object references for the report.
-        object_refs = create_object_refs(
+        object_refs = create_object_refs_from_lists(
             malwares,
             intrusion_sets,
             intrusion_sets_use_malwares,
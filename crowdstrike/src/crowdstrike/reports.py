@@ -16,7 +16,7 @@ from crowdstrike.report_bundle_builder import ReportBundleBuilder
 from crowdstrike.utils import (
     create_file_from_download,
     datetime_to_timestamp,
-    paginate,
+    paginate_items,
     timestamp_to_datetime,
 )
 
@@ -71,31 +71,29 @@ class ReportImporter:
         )
 
         latest_fetched_report_timestamp = None
+        report_count = 0
 
-        for reports_batch in self._fetch_reports(fetch_timestamp):
-            if not reports_batch:
-                break
-
+        for report in self._fetch_reports(fetch_timestamp):
             if latest_fetched_report_timestamp is None:
-                first_in_batch = reports_batch[0]
-
-                created_date = first_in_batch.created_date
+                created_date = report.created_date
                 if created_date is None:
                     self._error(
                         "Missing created date for report {0} ({1})",
-                        first_in_batch.name,
-                        first_in_batch.id,
+                        report.name,
+                        report.id,
                     )
                     break
 
                 latest_fetched_report_timestamp = datetime_to_timestamp(created_date)
 
-            self._process_reports(reports_batch)
+            self._process_report(report)
+            report_count += 1
 
         state_timestamp = latest_fetched_report_timestamp or fetch_timestamp
 
         self._info(
-            "Report importer completed, latest fetch {0}.",
+            "Report importer completed (imported: {0}), latest fetch {1}.",
+            report_count,
             timestamp_to_datetime(state_timestamp),
         )
 
@@ -112,9 +110,7 @@ class ReportImporter:
         fmt_msg = msg.format(*args)
         self.helper.log_error(fmt_msg)
 
-    def _fetch_reports(
-        self, start_timestamp: int
-    ) -> Generator[List[Report], None, None]:
+    def _fetch_reports(self, start_timestamp: int) -> Generator[Report, None, None]:
         limit = 30
         sort = "created_date|desc"
         fields = ["__full__"]
@@ -124,7 +120,7 @@ class ReportImporter:
         if self.include_types:
             fql_filter = f"{fql_filter}+type:{self.include_types}"
 
-        paginated_query = paginate(self._query_report_entities)
+        paginated_query = paginate_items(self._query_report_entities)
 
         return paginated_query(
             limit=limit, sort=sort, fql_filter=fql_filter, fields=fields
@@ -151,15 +147,6 @@ class ReportImporter:
             limit=limit, offset=offset, sort=sort, fql_filter=fql_filter, fields=fields
         )
 
-    def _process_reports(self, reports: List[Report]) -> None:
-        report_count = len(reports)
-        self._info("Processing {0} reports...", report_count)
-
-        for report in reports:
-            self._process_report(report)
-
-        self._info("Processing reports completed (imported: {0})", report_count)
-
     def _process_report(self, report: Report) -> None:
         self._info("Processing report {0}...", report.id)
 
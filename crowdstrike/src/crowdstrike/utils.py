@@ -2,12 +2,14 @@
 """OpenCTI CrowdStrike connector utilities module."""
 
 import base64
-import calendar
 import functools
+import itertools
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import (
     Any,
+    BinaryIO,
     Callable,
     Dict,
     Generator,
@@ -23,7 +25,7 @@ from crowdstrike_client.api.models import Response
 from crowdstrike_client.api.models.download import Download
 from crowdstrike_client.api.models.report import Actor, Entity, Report
 
-from lxml.html import fromstring
+from lxml.etree import HTMLParser, fromstring
 
 from pycti.utils.constants import CustomProperties
 
@@ -47,8 +49,16 @@ logger = logging.getLogger(__name__)
 T = TypeVar("T")
 
 
+_HTML_PARSER = HTMLParser(remove_blank_text=True, remove_comments=True)
+
+# Multiple of 3 bytes, so that the encoded chunks can be concatenated.
+_BASE64_CHUNK_SIZE = 57 * 1024
+
+_TAG_COLOR = "#cf3217"
+
+
 def paginate(
-    func: Callable[..., Response[T]]
+    func: Callable[..., Response[T]], prefetch: bool = False
 ) -> Callable[..., Generator[List[T], None, None]]:
     """Paginate API calls."""
 
@@ -56,13 +66,7 @@ def paginate(
     def wrapper_paginate(
         *args: Any, limit: int = 25, **kwargs: Any
     ) -> Generator[List[T], None, None]:
-        logger.info(
-            "func: %s, limit: %s, args: %s, kwargs: %s",
-            func.__name__,
-            limit,
-            args,
-            kwargs,
-        )
+        logger.info("func: %s, limit: %s", func.__name__, limit)
 
         total_count = 0
 
@@ -70,47 +74,86 @@ def paginate(
         _offset = 0
         _total = None
 
-        while next_batch(_limit, _offset, _total):
-            response = func(*args, limit=_limit, offset=_offset, **kwargs)
+        # Prefetch fetches the next page on a worker thread while the current one
+        # is consumed. The CrowdStrike client is not known to be thread-safe, only
+        # prefetch when the consumer makes no calls with the same client.
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        def fetch_page(offset: int) -> Callable[[], Response[T]]:
+            if executor is None:
+                return functools.partial(
+                    func, *args, limit=_limit, offset=offset, **kwargs
+                )
+            future = executor.submit(func, *args, limit=_limit, offset=offset, **kwargs)
+            return future.result
 
-            errors = response.errors
-            if errors:
-                logger.error("Query completed with errors")
-                for error in errors:
-                    logger.error("Error: %s (code: %s)", error.message, error.code)
+        try:
+            next_page: Optional[Callable[[], Response[T]]] = fetch_page(_offset)
 
-            meta = response.meta
-            if meta.pagination is not None:
-                pagination = meta.pagination
+            while next_page is not None:
+                response = next_page()
+                next_page = None
 
-                _meta_limit = pagination.limit
-                _meta_offset = pagination.offset
-                _meta_total = pagination.total
+                errors = response.errors
+                if errors:
+                    logger.error("Query completed with errors")
+                    for error in errors:
+                        logger.error("Error: %s (code: %s)", error.message, error.code)
 
-                logger.info(
-                    "Query pagination info limit: %s, offset: %s, total: %s",
-                    _meta_limit,
-                    _meta_offset,
-                    _meta_total,
-                )
+                meta = response.meta
+                if meta.pagination is not None:
+                    pagination = meta.pagination
+
+                    _meta_limit = pagination.limit
+                    _meta_offset = pagination.offset
+                    _meta_total = pagination.total
 
-                _offset = _offset + _limit
-                _total = _meta_total
+                    logger.debug(
+                        "Query pagination info limit: %s, offset: %s, total: %s",
+                        _meta_limit,
+                        _meta_offset,
+                        _meta_total,
+                    )
 
-            resources = response.resources
-            resources_count = len(resources)
+                    _offset = _offset + _limit
+                    _total = _meta_total
 
-            logger.info("Query fetched %s resources", resources_count)
+                if next_batch(_limit, _offset, _total):
+                    next_page = fetch_page(_offset)
 
-            total_count += resources_count
+                resources = response.resources
+                resources_count = len(resources)
 
-            yield resources
+                logger.debug("Query fetched %s resources", resources_count)
+
+                total_count += resources_count
+
+                yield resources
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         logger.info("Fetched %s resources in total", total_count)
 
     return wrapper_paginate
 
 
+def paginate_items(
+    func: Callable[..., Response[T]], prefetch: bool = False
+) -> Callable[..., Generator[T, None, None]]:
+    """Paginate API calls, yielding resources one by one."""
+    paginated_func = paginate(func, prefetch=prefetch)
+
+    @functools.wraps(func)
+    def wrapper_paginate_items(*args: Any, **kwargs: Any) -> Generator[T, None, None]:
+        for resources in paginated_func(*args, **kwargs):
+            if not resources:
+                break
+            yield from resources
+
+    return wrapper_paginate_items
+
+
 def next_batch(limit: int, offset: int, total: Optional[int]) -> bool:
     """Is there a next batch of resources?"""
     if total is None:
@@ -119,9 +162,10 @@ def next_batch(limit: int, offset: int, total: Optional[int]) -> bool:
 
 
 def datetime_to_timestamp(datetime_value: datetime) -> int:
-    # Use calendar.timegm because the time.mktime assumes that the input is in your
-    # local timezone.
-    return calendar.timegm(datetime_value.timetuple())
+    # Naive datetimes are in UTC, datetime.timestamp would assume local time.
+    if datetime_value.tzinfo is None:
+        datetime_value = datetime_value.replace(tzinfo=timezone.utc)
+    return int(datetime_value.timestamp())
 
 
 def timestamp_to_datetime(timestamp: int) -> datetime:
@@ -129,7 +173,7 @@ def timestamp_to_datetime(timestamp: int) -> datetime:
 
 
 def datetime_utc_now() -> datetime:
-    return datetime.utcnow()
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
 def datetime_utc_epoch_start() -> datetime:
@@ -329,17 +373,45 @@ def create_relationship(
     confidence_level: int,
 ) -> Relationship:
     """Create a relationship."""
+    custom_properties = _create_relationship_custom_properties(
+        first_seen, last_seen, confidence_level
+    )
+    return _create_relationship_with_custom_properties(
+        relationship_type,
+        author,
+        source,
+        target,
+        object_marking_refs,
+        custom_properties,
+    )
+
+
+def _create_relationship_custom_properties(
+    first_seen: datetime, last_seen: datetime, confidence_level: int
+) -> Dict[str, Any]:
+    return {
+        CustomProperties.FIRST_SEEN: first_seen,
+        CustomProperties.LAST_SEEN: last_seen,
+        CustomProperties.WEIGHT: confidence_level,
+    }
+
+
+def _create_relationship_with_custom_properties(
+    relationship_type: str,
+    author: Identity,
+    source: STIXDomainObject,
+    target: STIXDomainObject,
+    object_marking_refs: List[MarkingDefinition],
+    custom_properties: Mapping[str, Any],
+) -> Relationship:
+    # Relationship copies the custom properties, the mapping can be shared.
     return Relationship(
         created_by_ref=author,
         relationship_type=relationship_type,
         source_ref=source.id,
         target_ref=target.id,
         object_marking_refs=object_marking_refs,
-        custom_properties={
-            CustomProperties.FIRST_SEEN: first_seen,
-            CustomProperties.LAST_SEEN: last_seen,
-            CustomProperties.WEIGHT: confidence_level,
-        },
+        custom_properties=custom_properties,
     )
 
 
@@ -354,21 +426,20 @@ def create_relationships(
     confidence_level: int,
 ) -> List[Relationship]:
     """Create relationships."""
-    relationships = []
-    for source in sources:
-        for target in targets:
-            relationship = create_relationship(
-                relationship_type,
-                author,
-                source,
-                target,
-                object_marking_refs,
-                first_seen,
-                last_seen,
-                confidence_level,
-            )
-            relationships.append(relationship)
-    return relationships
+    custom_properties = _create_relationship_custom_properties(
+        first_seen, last_seen, confidence_level
+    )
+    return [
+        _create_relationship_with_custom_properties(
+            relationship_type,
+            author,
+            source,
+            target,
+            object_marking_refs,
+            custom_properties,
+        )
+        for source, target in itertools.product(sources, targets)
+    ]
 
 
 def create_targets_relationships(
@@ -446,13 +517,18 @@ def create_object_refs(
     ]
 ) -> List[STIXDomainObject]:
     """Create object references."""
-    object_refs = []
-    for obj in objects:
-        if isinstance(obj, STIXDomainObject):
-            object_refs.append(obj)
-        else:
-            object_refs.extend(obj)
-    return object_refs
+    return list(
+        itertools.chain.from_iterable(
+            (obj,) if isinstance(obj, STIXDomainObject) else obj for obj in objects
+        )
+    )
+
+
+def create_object_refs_from_lists(
+    *objects: Union[List[STIXRelationshipObject], List[STIXDomainObject]]
+) -> List[STIXDomainObject]:
+    """Create object references from lists of objects."""
+    return list(itertools.chain.from_iterable(objects))
 
 
 def create_tag(entity: Entity, source_name: str, color: str) -> Mapping[str, str]:
@@ -470,18 +546,14 @@ def create_tag(entity: Entity, source_name: str, color: str) -> Mapping[str, str
 
 def create_tags(entities: List[Entity], source_name: str) -> List[Mapping[str, str]]:
     """Create tags."""
-    color = "#cf3217"
-
-    tags = []
-    for entity in entities:
-        tag = create_tag(entity, source_name, color)
-        tags.append(tag)
-    return tags
+    return [create_tag(entity, source_name, _TAG_COLOR) for entity in entities]
 
 
 def remove_html_tags(html_text: str) -> str:
-    document = fromstring(html_text)
-    text = document.text_content()
+    document = fromstring(html_text, _HTML_PARSER)
+    if document is None:
+        return ""
+    text = "".join(document.itertext())
     return text.strip()
 
 
@@ -591,10 +663,30 @@ def create_file_from_download(download: Download) -> Mapping[str, str]:
         logger.error("File download missing a filename")
         filename = "DOWNLOAD_MISSING_FILENAME"
 
-    base64_data = base64.b64encode(download.content.read())
+    base64_data = base64_encode_stream(download.content)
 
     return {
         "name": filename,
-        "data": base64_data.decode("utf-8"),
+        "data": base64_data,
         "mime_type": "application/pdf",
     }
+
+
+def base64_encode_stream(stream: BinaryIO) -> str:
+    """Base64 encode binary stream content."""
+    encoded = bytearray()
+    remainder = b""
+    while True:
+        chunk = stream.read(_BASE64_CHUNK_SIZE)
+        if not chunk:
+            break
+        if remainder:
+            chunk = remainder + chunk
+
+        # The stream may return short reads, keep the unaligned tail for later.
+        aligned_length = len(chunk) - len(chunk) % 3
+        encoded += base64.b64encode(chunk[:aligned_length])
+        remainder = chunk[aligned_length:]
+
+    encoded += base64.b64encode(remainder)
+    return encoded.decode("ascii")